@@ -1,46 +1,304 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, Form, HTTPException, Request, BackgroundTasks
+import time
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, UploadFile, File, Form, HTTPException, Request, BackgroundTasks, Depends, Header
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse, ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, UpdateOne
 import os
+import sys
+import asyncio
+import random
+import threading
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
+import secrets
+import re
 from datetime import datetime, timezone
+from collections import Counter, deque
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
 import shutil
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
+import csv
+import io
+import orjson
 import json
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']  
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'creative_clicks')]
+# Request profiling (opt-in). Requests are sampled at PROFILE_SAMPLE_RATE, or
+# every request is profiled and kept only if it takes at least PROFILE_SLOW_MS.
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', '0'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+PROFILE_BUFFER_SIZE = int(os.environ.get('PROFILE_BUFFER_SIZE', '50'))
+PROFILING_ENABLED = PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.id = str(uuid.uuid4())
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = 0.0
+        self.samples: Counter = Counter()
+        self.mongo_commands: List[Dict[str, Any]] = []
+        self.pending_commands: Dict[int, Dict[str, Any]] = {}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "sample_count": sum(self.samples.values()),
+            "mongo_commands": self.mongo_commands,
+        }
+
+    def folded(self) -> str:
+        # One "frame;frame;frame count" line per stack, as read by flamegraph.pl and speedscope
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.items())
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+profiles: deque = deque(maxlen=PROFILE_BUFFER_SIZE)
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+def _task_stack(task: asyncio.Task, thread_frame) -> tuple:
+    """Root-first stack of a task, following the await chain of suspended coroutines."""
+    frames = []
+    awaited = None
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        awaited = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        coro = awaited if hasattr(awaited, "cr_frame") or hasattr(awaited, "gi_frame") else None
+
+    labels = [_frame_label(frame) for frame in frames]
+    if not frames:
+        return tuple(labels)
+
+    # A running task also has synchronous calls below its innermost coroutine
+    sync_frames = []
+    frame = thread_frame if awaited is None else None
+    while frame is not None and frame is not frames[-1]:
+        sync_frames.append(frame)
+        frame = frame.f_back
+    if frame is not None:
+        labels.extend(_frame_label(f) for f in reversed(sync_frames))
+    elif awaited is not None:
+        labels.append(f"<await {type(awaited).__name__}>")
+    return tuple(labels)
 
-# Create directories for uploads
+class StackSampler:
+    """Background thread that samples the stacks of profiled request tasks."""
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self._active: Dict[asyncio.Task, tuple] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, task: asyncio.Task, profile: RequestProfile):
+        with self._lock:
+            self._active[task] = (profile, threading.get_ident())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def detach(self, task: asyncio.Task):
+        with self._lock:
+            self._active.pop(task, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                active = list(self._active.items())
+            try:
+                self._sample(active)
+            except Exception as e:
+                # A failed pass drops one sample; the thread keeps running for later ones
+                logging.error(f"Request profiler sample failed: {e}")
+
+    def _sample(self, active: List[tuple]):
+        thread_frames = sys._current_frames()
+        stacks = [(task, profile, _task_stack(task, thread_frames.get(thread_id))) for task, (profile, thread_id) in active]
+        # Record under the lock and only for tasks still attached, so a profile
+        # is never mutated once detach() has returned and it is readable
+        with self._lock:
+            for task, profile, stack in stacks:
+                if stack and task in self._active:
+                    profile.samples[stack] += 1
+
+sampler = StackSampler(PROFILE_INTERVAL_MS)
+
+class ProfileCommandListener(monitoring.CommandListener):
+    """Records the Mongo commands issued while a profiled request is in flight."""
+
+    def started(self, event):
+        profile = _current_profile.get()
+        if profile is not None:
+            target = event.command.get(event.command_name)
+            profile.pending_commands[event.request_id] = {
+                "command": event.command_name,
+                "collection": target if isinstance(target, str) else None,
+            }
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "failed")
+
+    def _finish(self, event, status: str):
+        profile = _current_profile.get()
+        if profile is None:
+            return
+        command = profile.pending_commands.pop(event.request_id, {"command": event.command_name, "collection": None})
+        command.update(duration_ms=event.duration_micros / 1000, status=status)
+        profile.mongo_commands.append(command)
+
+class RequestProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        sampled = random.random() < PROFILE_SAMPLE_RATE
+        if not sampled and PROFILE_SLOW_MS <= 0:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+        task = asyncio.current_task()
+        sampler.attach(task, profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            sampler.detach(task)
+            _current_profile.reset(token)
+            if sampled or profile.duration_ms >= PROFILE_SLOW_MS:
+                profiles.append(profile)
+
+# MongoDB connection, opened by connect_db() when the app starts
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def connect_db():
+    global client, db
+    if client is None:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            event_listeners=[ProfileCommandListener()] if PROFILING_ENABLED else []
+        )
+        db = client[os.environ.get('DB_NAME', 'creative_clicks')]
+    return db
+
+# Directory for uploads, created when the app starts
 UPLOAD_DIR = ROOT_DIR / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
+
+# Startup. The process serves /healthz as soon as it is up; Mongo warmup and
+# index bootstrapping run concurrently in the background and /readyz reports
+# ready once both have finished.
+startup_state: Dict[str, Any] = {"ready": False, "timings": {}}
+
+async def _timed(name: str, awaitable):
+    started = time.perf_counter()
+    result = await awaitable
+    startup_state["timings"][f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+async def _gather_all(*awaitables):
+    # Let every step finish before reporting a failure, so a retry never runs
+    # alongside steps left over from the previous attempt
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+async def warm_up():
+    delay = 1
+    while True:
+        started = time.perf_counter()
+        try:
+            await _gather_all(
+                _timed("mongo_ping", db.command("ping")),
+                _timed("indexes", bootstrap_indexes())
+            )
+        except Exception as e:
+            logging.error(f"Startup warmup failed, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+            continue
+        startup_state["timings"]["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        startup_state["ready"] = True
+        logging.info(f"Backend ready: {startup_state['timings']}")
+        return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    UPLOAD_DIR.mkdir(exist_ok=True)
+    connect_db()
+    warmup_task = asyncio.create_task(warm_up())
+    backfill_task = asyncio.create_task(run_search_backfill(warmup_task))
+    sweeper_task = asyncio.create_task(run_media_sweeper())
+    yield
+    warmup_task.cancel()
+    backfill_task.cancel()
+    sweeper_task.cancel()
+    client.close()
 
 # Create the main app
-app = FastAPI(title="Creative Clicks API")
+app = FastAPI(title="Creative Clicks API", lifespan=lifespan)
 
 # Mount static files
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR), check_dir=False), name="uploads")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Stripe setup
+# Admin access. Admin endpoints require ADMIN_TOKEN in the X-Admin-Token header
+# and are disabled when no token is configured.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin access is not configured")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+# Stripe setup. The payment integration is imported on first use.
 STRIPE_API_KEY = os.environ.get('STRIPE_API_KEY')
 
+def stripe_integration():
+    from emergentintegrations.payments.stripe import checkout
+    return checkout
+
+def stripe_checkout_client(webhook_url: str = ""):
+    return stripe_integration().StripeCheckout(api_key=STRIPE_API_KEY, webhook_url=webhook_url)
+
 # Models
 class MediaItem(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -147,6 +405,33 @@ class ContactMessageCreate(BaseModel):
     subject: str
     message: str
 
+# Listing serialization. Documents written through the models above are already
+# valid, so list endpoints project the model's fields from Mongo and encode them
+# straight to JSON instead of re-validating every item. response_model is kept on
+# the routes for the OpenAPI schema; FastAPI skips it when a Response is returned.
+class ListingSerializer:
+    def __init__(self, model):
+        self.fields = list(model.model_fields)
+        self.projection = {"_id": 0, **{name: 1 for name in self.fields}}
+        # Static defaults fill fields missing from documents written by older versions
+        self.defaults = {
+            name: field.default
+            for name, field in model.model_fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+
+    def fill(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not self.defaults:
+            return docs
+        return [{**self.defaults, **doc} for doc in docs]
+
+    def response(self, docs: List[Dict[str, Any]]) -> ORJSONResponse:
+        return ORJSONResponse(self.fill(docs))
+
+media_listing = ListingSerializer(MediaItem)
+workshop_listing = ListingSerializer(Workshop)
+booking_listing = ListingSerializer(EventBooking)
+
 # Helper function to send emails
 async def send_email(to_email: str, subject: str, body: str):
     try:
@@ -159,6 +444,335 @@ async def send_email(to_email: str, subject: str, body: str):
         logging.error(f"Failed to send email: {e}")
         return False
 
+# Media search. Each media document carries the words of its title, description
+# and original name (search_tokens) plus every prefix of those words
+# (search_terms, and search_title_terms for the title alone). A multikey index
+# on search_terms answers prefix queries without scanning the collection;
+# ranking and category facets run in one aggregation.
+SEARCH_MIN_PREFIX = 2
+SEARCH_MAX_TOKEN = 24
+SEARCH_BACKFILL_BATCH = 500
+
+def _search_tokens(*texts: Optional[str]) -> List[str]:
+    tokens = []
+    for text in texts:
+        tokens.extend(re.findall(r"[a-z0-9]+", (text or "").lower()))
+    return list(dict.fromkeys(token[:SEARCH_MAX_TOKEN] for token in tokens))
+
+def _search_prefixes(tokens: List[str]) -> List[str]:
+    terms = {token for token in tokens if len(token) < SEARCH_MIN_PREFIX}
+    for token in tokens:
+        terms.update(token[:end] for end in range(SEARCH_MIN_PREFIX, len(token) + 1))
+    return sorted(terms)
+
+def media_search_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    tokens = _search_tokens(item.get("title"), item.get("description"), item.get("original_name"))
+    return {
+        "search_tokens": tokens,
+        "search_terms": _search_prefixes(tokens),
+        "search_title_terms": _search_prefixes(_search_tokens(item.get("title")))
+    }
+
+async def bootstrap_indexes():
+    await _gather_all(
+        db.media_items.create_index("search_terms"),
+        db.media_items.create_index([("uploaded_at", -1)]),
+        db.media_items.create_index("deleted_at", sparse=True),
+        db.workshops.create_index("id"),
+        db.workshop_registrations.create_index("payment_session_id"),
+        db.payment_transactions.create_index("session_id"),
+        # Date fields that exports filter and sort on (also the bookings listing sort)
+        *(db[source.collection].create_index(source.date_field) for source in EXPORT_SOURCES.values())
+    )
+
+async def backfill_media_search():
+    batch = []
+    async for item in db.media_items.find(
+        {"search_terms": {"$exists": False}}, {"title": 1, "description": 1, "original_name": 1}
+    ):
+        batch.append(UpdateOne({"_id": item["_id"]}, {"$set": media_search_fields(item)}))
+        if len(batch) >= SEARCH_BACKFILL_BATCH:
+            await db.media_items.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.media_items.bulk_write(batch, ordered=False)
+
+async def run_search_backfill(warmup_task: asyncio.Task):
+    # Starts once the app is ready, so legacy documents never hold up /readyz
+    await warmup_task
+    try:
+        await backfill_media_search()
+    except Exception as e:
+        logging.error(f"Media search backfill failed: {e}")
+
+# Analytics rollups. Summary documents in analytics_rollups are updated with $inc
+# on every write, so dashboards read O(buckets) documents instead of raw rows.
+# rebuild_analytics() recomputes them from the raw collections for backfill.
+def _month(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+def _booking_rollup(month: str, event_type: str) -> Dict[str, Any]:
+    return {"_id": f"bookings:{month}:{event_type}", "metric": "bookings", "month": month, "event_type": event_type}
+
+def _workshop_rollup(workshop_id: str) -> Dict[str, Any]:
+    return {"_id": f"workshop:{workshop_id}", "metric": "workshop", "workshop_id": workshop_id}
+
+def _revenue_rollup(month: str, payment_type: str, currency: str) -> Dict[str, Any]:
+    return {
+        "_id": f"revenue:{month}:{payment_type}:{currency}",
+        "metric": "revenue", "month": month, "payment_type": payment_type, "currency": currency
+    }
+
+async def _increment_rollup(key: Dict[str, Any], inc: Dict[str, Any], **fields):
+    rollup_id, labels = key["_id"], {k: v for k, v in key.items() if k != "_id"}
+    await db.analytics_rollups.update_one(
+        {"_id": rollup_id},
+        {"$set": {**labels, **fields}, "$inc": inc},
+        upsert=True
+    )
+
+async def rollup_booking(booking: EventBooking):
+    await _increment_rollup(_booking_rollup(_month(booking.booking_date), booking.event_type), {"count": 1})
+
+async def rollup_registration(workshop: Workshop):
+    await _increment_rollup(
+        _workshop_rollup(workshop.id), {"registered": 1},
+        title=workshop.title, max_participants=workshop.max_participants
+    )
+
+async def rollup_payment(transaction: Dict[str, Any], paid_at: datetime):
+    key = _revenue_rollup(_month(paid_at), transaction["payment_type"], transaction.get("currency", "usd"))
+    await _increment_rollup(key, {"amount": transaction["amount"], "count": 1})
+    workshop_id = (transaction.get("metadata") or {}).get("workshop_id")
+    if transaction["payment_type"] == "workshop" and workshop_id:
+        await _increment_rollup(_workshop_rollup(workshop_id), {"paid": 1})
+
+async def record_rollup(rollup):
+    # Rollups are derived data that rebuild_analytics() can repair, so a failure
+    # here must not fail the request whose record is already saved
+    try:
+        await rollup
+    except Exception as e:
+        logging.error(f"Analytics rollup failed: {e}")
+
+async def rollup_paid_transaction(session_id: str):
+    # The rolled_up flag is claimed before counting, so redelivered webhooks and
+    # repeated status polls count a payment once. A failed rollup releases the
+    # claim and the next webhook retry or status poll counts it instead.
+    transaction = await db.payment_transactions.find_one_and_update(
+        {"session_id": session_id, "payment_status": "paid", "rolled_up": {"$ne": True}},
+        {"$set": {"rolled_up": True}}
+    )
+    if not transaction:
+        return
+    try:
+        await rollup_payment(transaction, transaction["updated_at"])
+    except Exception as e:
+        logging.error(f"Revenue rollup failed for session {session_id}, will retry: {e}")
+        await record_rollup(db.payment_transactions.update_one(
+            {"_id": transaction["_id"]}, {"$unset": {"rolled_up": ""}}
+        ))
+
+async def update_payment_status(session_id: str, payment_status: str):
+    # Only a real status change is written, so updated_at marks the transition
+    await db.payment_transactions.update_one(
+        {"session_id": session_id, "payment_status": {"$ne": payment_status}},
+        {"$set": {"payment_status": payment_status, "updated_at": datetime.now(timezone.utc)}}
+    )
+
+    if payment_status == "paid":
+        await db.workshop_registrations.update_one(
+            {"payment_session_id": session_id},
+            {"$set": {"payment_status": "paid"}}
+        )
+        await rollup_paid_transaction(session_id)
+
+async def rebuild_analytics() -> Dict[str, int]:
+    month_of = lambda field: {"$dateToString": {"format": "%Y-%m", "date": f"${field}"}}
+    rollups = []
+
+    # Paid transactions are counted by the aggregation below, so mark them as
+    # rolled up to keep later status polls from counting them again
+    await db.payment_transactions.update_many(
+        {"payment_status": "paid", "rolled_up": {"$ne": True}}, {"$set": {"rolled_up": True}}
+    )
+
+    async for row in db.event_bookings.aggregate([
+        {"$group": {"_id": {"month": month_of("booking_date"), "event_type": "$event_type"}, "count": {"$sum": 1}}}
+    ]):
+        rollups.append({**_booking_rollup(row["_id"]["month"], row["_id"]["event_type"]), "count": row["count"]})
+
+    async for row in db.workshop_registrations.aggregate([
+        {"$group": {
+            "_id": "$workshop_id",
+            "registered": {"$sum": 1},
+            "paid": {"$sum": {"$cond": [{"$eq": ["$payment_status", "paid"]}, 1, 0]}}
+        }},
+        {"$lookup": {"from": "workshops", "localField": "_id", "foreignField": "id", "as": "workshop"}}
+    ]):
+        workshop = row["workshop"][0] if row["workshop"] else {}
+        rollups.append({
+            **_workshop_rollup(row["_id"]),
+            "title": workshop.get("title"),
+            "max_participants": workshop.get("max_participants"),
+            "registered": row["registered"],
+            "paid": row["paid"]
+        })
+
+    async for row in db.payment_transactions.aggregate([
+        {"$match": {"payment_status": "paid"}},
+        {"$group": {
+            "_id": {"month": month_of("updated_at"), "payment_type": "$payment_type", "currency": "$currency"},
+            "amount": {"$sum": "$amount"},
+            "count": {"$sum": 1}
+        }}
+    ]):
+        key = row["_id"]
+        rollups.append({
+            **_revenue_rollup(key["month"], key["payment_type"], key["currency"]),
+            "amount": row["amount"],
+            "count": row["count"]
+        })
+
+    # Build the new rollups aside and swap them in with a rename, so dashboards
+    # never read a partial set. Increments landing while the aggregations run are
+    # not in the new set; run rebuilds for backfill, not routinely.
+    staging = db.analytics_rollups_rebuild
+    await staging.drop()
+    if not rollups:
+        await db.analytics_rollups.delete_many({})
+        return {"rollups": 0}
+    await staging.insert_many(rollups)
+    await staging.rename("analytics_rollups", dropTarget=True)
+    return {"rollups": len(rollups)}
+
+# Media garbage collection. delete_media only tombstones a record. The sweeper
+# removes the record's files (the upload and any "<stem>_<variant>" renditions)
+# off the event loop and only then the record, so a crash at any point is retried
+# on the next sweep. The background loop only handles tombstones. Reclaiming
+# files in UPLOAD_DIR that no record refers to runs on demand, or in the loop
+# when MEDIA_SWEEP_ORPHANS is set, and refuses to run when the database looks
+# wrong for the directory (no media records, or most files unreferenced).
+MEDIA_SWEEP_INTERVAL = int(os.environ.get('MEDIA_SWEEP_INTERVAL', '60'))
+MEDIA_SWEEP_ORPHANS = os.environ.get('MEDIA_SWEEP_ORPHANS', '').lower() in ('1', 'true', 'yes')
+MEDIA_SWEEP_BATCH = 200
+ORPHAN_GRACE_SECONDS = 3600  # leaves room for uploads whose record is not inserted yet
+ORPHAN_MAX_FRACTION = 0.5
+ORPHAN_REPORT_LIMIT = 100
+
+sweeper_stats: Dict[str, Any] = {
+    "runs": 0, "records_removed": 0, "files_removed": 0, "bytes_reclaimed": 0, "last_run": None
+}
+
+def _media_key(filename: str) -> str:
+    return Path(filename).stem.split("_", 1)[0]
+
+def _remove_files(paths: List[Path], dry_run: bool = False) -> Tuple[int, int]:
+    removed = reclaimed = 0
+    for path in paths:
+        try:
+            size = path.stat().st_size
+            if not dry_run:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+        reclaimed += size
+    return removed, reclaimed
+
+def _media_files(filenames: List[str]) -> List[Path]:
+    paths = set()
+    for filename in filenames:
+        name = Path(filename).name
+        paths.add(UPLOAD_DIR / name)
+        key = _media_key(name)
+        paths.update(UPLOAD_DIR.glob(f"{key}.*"))
+        paths.update(UPLOAD_DIR.glob(f"{key}_*"))
+    return sorted(paths)
+
+def _orphan_candidates(cutoff: float) -> Tuple[Dict[str, List[Path]], int]:
+    """Files older than cutoff grouped by media key, and the number of files in UPLOAD_DIR"""
+    candidates: Dict[str, List[Path]] = {}
+    total = 0
+    if not UPLOAD_DIR.exists():
+        return candidates, total
+    for path in UPLOAD_DIR.iterdir():
+        if path.name.startswith(".") or not path.is_file():
+            continue
+        total += 1
+        if path.stat().st_mtime <= cutoff:
+            candidates.setdefault(_media_key(path.name), []).append(path)
+    return candidates, total
+
+async def _sweep_tombstones(report: Dict[str, Any], dry_run: bool):
+    cursor = db.media_items.find(
+        {"deleted_at": {"$exists": True}}, {"_id": 1, "filename": 1}, batch_size=MEDIA_SWEEP_BATCH
+    )
+    while True:
+        tombstones = await cursor.to_list(MEDIA_SWEEP_BATCH)
+        if not tombstones:
+            break
+        paths = await asyncio.to_thread(_media_files, [t["filename"] for t in tombstones])
+        removed, reclaimed = await asyncio.to_thread(_remove_files, paths, dry_run)
+        report["files_removed"] += removed
+        report["bytes_reclaimed"] += reclaimed
+        if dry_run:
+            report["records_removed"] += len(tombstones)
+        else:
+            result = await db.media_items.delete_many({"_id": {"$in": [t["_id"] for t in tombstones]}})
+            report["records_removed"] += result.deleted_count
+
+async def _sweep_orphans(report: Dict[str, Any], dry_run: bool):
+    candidates, total = await asyncio.to_thread(_orphan_candidates, time.time() - ORPHAN_GRACE_SECONDS)
+    if not candidates:
+        return
+    if not await db.media_items.estimated_document_count():
+        report["orphans_aborted"] = "media_items is empty"
+        return
+
+    referenced = set()
+    async for item in db.media_items.find({}, {"_id": 0, "filename": 1}):
+        referenced.add(_media_key(item["filename"]))
+    orphans = [path for key, paths in candidates.items() if key not in referenced for path in paths]
+    if len(orphans) > total * ORPHAN_MAX_FRACTION:
+        report["orphans_aborted"] = f"{len(orphans)} of {total} files in {UPLOAD_DIR.name}/ are unreferenced"
+        return
+
+    report["orphan_files"] = [path.name for path in orphans[:ORPHAN_REPORT_LIMIT]]
+    for start in range(0, len(orphans), MEDIA_SWEEP_BATCH):
+        removed, reclaimed = await asyncio.to_thread(_remove_files, orphans[start:start + MEDIA_SWEEP_BATCH], dry_run)
+        report["files_removed"] += removed
+        report["bytes_reclaimed"] += reclaimed
+
+async def sweep_media(orphans: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """Remove tombstoned media and, if asked, unreferenced files. A dry run only reports."""
+    report: Dict[str, Any] = {"dry_run": dry_run, "records_removed": 0, "files_removed": 0, "bytes_reclaimed": 0}
+    await _sweep_tombstones(report, dry_run)
+    if orphans:
+        await _sweep_orphans(report, dry_run)
+        if report.get("orphans_aborted"):
+            logging.warning(f"Media sweep skipped orphan files: {report['orphans_aborted']}")
+
+    if dry_run:
+        return report
+    for key in ("records_removed", "files_removed", "bytes_reclaimed"):
+        sweeper_stats[key] += report[key]
+    sweeper_stats["runs"] += 1
+    sweeper_stats["last_run"] = datetime.now(timezone.utc)
+    if report["files_removed"] or report["records_removed"]:
+        logging.info(f"Media sweep: {report}")
+    return report
+
+async def run_media_sweeper():
+    while True:
+        await asyncio.sleep(MEDIA_SWEEP_INTERVAL)
+        if not startup_state["ready"]:
+            continue
+        try:
+            await sweep_media(orphans=MEDIA_SWEEP_ORPHANS)
+        except Exception as e:
+            logging.error(f"Media sweep failed: {e}")
+
 # Routes
 
 @api_router.get("/")
@@ -204,31 +818,67 @@ async def upload_media(
         category=category
     )
     
-    await db.media_items.insert_one(media_item.dict())
+    await db.media_items.insert_one({**media_item.dict(), **media_search_fields(media_item.dict())})
     return media_item
 
 @api_router.get("/media", response_model=List[MediaItem])
 async def get_media(category: Optional[str] = None):
-    query = {}
+    query = {"deleted_at": {"$exists": False}}
     if category:
         query["category"] = category
     
-    media_items = await db.media_items.find(query).sort("uploaded_at", -1).to_list(100)
-    return [MediaItem(**item) for item in media_items]
+    media_items = await db.media_items.find(query, media_listing.projection).sort("uploaded_at", -1).to_list(100)
+    return media_listing.response(media_items)
+
+@api_router.get("/media/search")
+async def search_media(q: str, category: Optional[str] = None, skip: int = 0, limit: int = 20):
+    # Browsing without a query is GET /media, which sorts on the uploaded_at index
+    terms = _search_tokens(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    query = {"deleted_at": {"$exists": False}, "search_terms": {"$all": terms}}
+    results_query = {"category": category} if category else {}
+
+    # Whole-word matches score 1 and title matches (whole or prefix) score 2
+    score = {"$add": [
+        {"$size": {"$setIntersection": [{"$ifNull": ["$search_tokens", []]}, terms]}},
+        {"$multiply": [2, {"$size": {"$setIntersection": [{"$ifNull": ["$search_title_terms", []]}, terms]}}]}
+    ]}
+    fields = {name: 1 for name in media_listing.fields}
+
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "items": [
+                {"$match": results_query},
+                {"$addFields": {"score": score}},
+                {"$sort": {"score": -1, "uploaded_at": -1}},
+                {"$skip": max(skip, 0)},
+                {"$limit": min(max(limit, 1), 100)},
+                {"$project": {"_id": 0, "score": 1, **fields}}
+            ],
+            "total": [{"$match": results_query}, {"$count": "count"}],
+            "facets": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}]
+        }}
+    ]
+    result = (await db.media_items.aggregate(pipeline).to_list(1))[0]
+
+    return ORJSONResponse({
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "items": media_listing.fill(result["items"]),
+        "facets": {facet["_id"]: facet["count"] for facet in result["facets"]}
+    })
 
 @api_router.delete("/media/{media_id}")
 async def delete_media(media_id: str):
-    media_item = await db.media_items.find_one({"id": media_id})
-    if not media_item:
+    # Tombstone the record; the media sweeper removes the files and then the record
+    result = await db.media_items.update_one(
+        {"id": media_id, "deleted_at": {"$exists": False}},
+        {"$set": {"deleted_at": datetime.now(timezone.utc)}}
+    )
+    if not result.matched_count:
         raise HTTPException(status_code=404, detail="Media item not found")
     
-    # Delete file
-    file_path = UPLOAD_DIR / media_item["filename"]
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Delete record
-    await db.media_items.delete_one({"id": media_id})
     return {"message": "Media item deleted successfully"}
 
 # Workshop Management
@@ -241,8 +891,8 @@ async def create_workshop(workshop: WorkshopCreate):
 @api_router.get("/workshops", response_model=List[Workshop])
 async def get_workshops(active_only: bool = True):
     query = {"is_active": True} if active_only else {}
-    workshops = await db.workshops.find(query).sort("start_date", 1).to_list(100)
-    return [Workshop(**workshop) for workshop in workshops]
+    workshops = await db.workshops.find(query, workshop_listing.projection).sort("start_date", 1).to_list(100)
+    return workshop_listing.response(workshops)
 
 @api_router.get("/workshops/{workshop_id}", response_model=Workshop)
 async def get_workshop(workshop_id: str):
@@ -264,6 +914,7 @@ async def register_workshop(workshop_id: str, registration: WorkshopRegistration
     # Create registration record
     registration_obj = WorkshopRegistration(**registration.dict())
     await db.workshop_registrations.insert_one(registration_obj.dict())
+    await record_rollup(rollup_registration(workshop_obj))
     
     # Create Stripe checkout session
     host_url = str(request.base_url).rstrip('/')
@@ -271,9 +922,9 @@ async def register_workshop(workshop_id: str, registration: WorkshopRegistration
     cancel_url = f"{host_url}/workshops"
     
     webhook_url = f"{host_url}/api/webhook/stripe"
-    stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url=webhook_url)
+    stripe_checkout = stripe_checkout_client(webhook_url)
     
-    checkout_request = CheckoutSessionRequest(
+    checkout_request = stripe_integration().CheckoutSessionRequest(
         amount=workshop_obj.price,
         currency="usd",
         success_url=success_url,
@@ -308,26 +959,11 @@ async def register_workshop(workshop_id: str, registration: WorkshopRegistration
 
 @api_router.get("/payments/{session_id}/status")
 async def get_payment_status(session_id: str):
-    stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url="")
+    stripe_checkout = stripe_checkout_client()
     status_response = await stripe_checkout.get_checkout_status(session_id)
     
-    # Update payment transaction
-    await db.payment_transactions.update_one(
-        {"session_id": session_id},
-        {
-            "$set": {
-                "payment_status": status_response.payment_status,
-                "updated_at": datetime.now(timezone.utc)
-            }
-        }
-    )
-    
-    # If paid, update registration
-    if status_response.payment_status == "paid":
-        await db.workshop_registrations.update_one(
-            {"payment_session_id": session_id},
-            {"$set": {"payment_status": "paid"}}
-        )
+    # Update payment transaction, and the registration if paid
+    await update_payment_status(session_id, status_response.payment_status)
     
     return status_response
 
@@ -336,6 +972,7 @@ async def get_payment_status(session_id: str):
 async def create_booking(booking: EventBookingCreate):
     booking_obj = EventBooking(**booking.dict())
     await db.event_bookings.insert_one(booking_obj.dict())
+    await record_rollup(rollup_booking(booking_obj))
     
     # Send notification email
     subject = f"New Event Booking - {booking.event_type}"
@@ -357,8 +994,8 @@ async def create_booking(booking: EventBookingCreate):
 
 @api_router.get("/bookings", response_model=List[EventBooking])
 async def get_bookings():
-    bookings = await db.event_bookings.find().sort("booking_date", -1).to_list(100)
-    return [EventBooking(**booking) for booking in bookings]
+    bookings = await db.event_bookings.find({}, booking_listing.projection).sort("booking_date", -1).to_list(100)
+    return booking_listing.response(bookings)
 
 # Contact Form
 @api_router.post("/contact", response_model=ContactMessage)
@@ -386,7 +1023,7 @@ async def submit_contact(message: ContactMessageCreate):
 @api_router.post("/webhook/stripe")
 async def stripe_webhook(request: Request):
     webhook_request_body = await request.body()
-    stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url="")
+    stripe_checkout = stripe_checkout_client()
     
     try:
         webhook_response = await stripe_checkout.handle_webhook(
@@ -395,32 +1032,146 @@ async def stripe_webhook(request: Request):
         )
         
         if webhook_response.event_type == "checkout.session.completed":
-            # Update payment status
-            await db.payment_transactions.update_one(
-                {"session_id": webhook_response.session_id},
-                {
-                    "$set": {
-                        "payment_status": webhook_response.payment_status,
-                        "updated_at": datetime.now(timezone.utc)
-                    }
-                }
-            )
-            
-            # Update registration if workshop payment
-            if webhook_response.payment_status == "paid":
-                await db.workshop_registrations.update_one(
-                    {"payment_session_id": webhook_response.session_id},
-                    {"$set": {"payment_status": "paid"}}
-                )
+            # Update payment status, and the registration if workshop payment
+            await update_payment_status(webhook_response.session_id, webhook_response.payment_status)
         
         return {"status": "processed"}
     except Exception as e:
         logging.error(f"Webhook error: {e}")
         raise HTTPException(status_code=400, detail="Webhook processing failed")
 
+# Analytics
+@api_router.get("/analytics", dependencies=[Depends(require_admin)])
+async def get_analytics():
+    rollups = await db.analytics_rollups.find({}, {"_id": 0}).to_list(None)
+    bookings = sorted((r for r in rollups if r["metric"] == "bookings"), key=lambda r: (r["month"], r["event_type"]))
+    revenue = sorted((r for r in rollups if r["metric"] == "revenue"), key=lambda r: (r["month"], r["payment_type"]))
+    workshops = [r for r in rollups if r["metric"] == "workshop"]
+    for workshop in workshops:
+        workshop.setdefault("registered", 0)
+        workshop.setdefault("paid", 0)
+        max_participants = workshop.get("max_participants")
+        workshop["fill_rate"] = workshop["paid"] / max_participants if max_participants else None
+
+    return {"bookings_by_month": bookings, "workshops": workshops, "revenue_by_month": revenue}
+
+@api_router.post("/analytics/rebuild", dependencies=[Depends(require_admin)])
+async def rebuild_analytics_rollups():
+    return await rebuild_analytics()
+
+# Admin: reporting exports
+EXPORT_BATCH_SIZE = 1000
+
+class ExportSource:
+    def __init__(self, collection: str, date_field: str, model):
+        self.collection = collection
+        self.date_field = date_field
+        self.listing = ListingSerializer(model)
+
+EXPORT_SOURCES = {
+    "bookings": ExportSource("event_bookings", "booking_date", EventBooking),
+    "registrations": ExportSource("workshop_registrations", "registration_date", WorkshopRegistration),
+    "payments": ExportSource("payment_transactions", "created_at", PaymentTransaction),
+}
+
+# Characters that make spreadsheet applications evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+def _csv_chunk(rows: List[List[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+async def _export_chunks(cursor, source: ExportSource, export_format: str):
+    # One chunk per cursor batch, so memory stays bounded by EXPORT_BATCH_SIZE
+    fields = source.listing.fields
+    try:
+        if export_format == "csv":
+            yield _csv_chunk([fields])
+        while True:
+            docs = await cursor.to_list(EXPORT_BATCH_SIZE)
+            if not docs:
+                break
+            docs = source.listing.fill(docs)
+            if export_format == "csv":
+                yield _csv_chunk([[_csv_value(doc.get(field)) for field in fields] for doc in docs])
+            else:
+                yield b"".join(orjson.dumps(doc) + b"\n" for doc in docs)
+    finally:
+        await cursor.close()
+
+@api_router.get("/export/{dataset}", dependencies=[Depends(require_admin)])
+async def export_dataset(
+    dataset: str,
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    source = EXPORT_SOURCES.get(dataset)
+    if not source:
+        raise HTTPException(status_code=404, detail="Unknown export dataset")
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Export format must be ndjson or csv")
+
+    query = {}
+    if start or end:
+        query[source.date_field] = {}
+        if start:
+            query[source.date_field]["$gte"] = start
+        if end:
+            query[source.date_field]["$lt"] = end
+
+    cursor = db[source.collection].find(query, source.listing.projection, batch_size=EXPORT_BATCH_SIZE).sort(source.date_field, 1)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(cursor, source, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'}
+    )
+
+# Admin: media sweeper
+@api_router.get("/admin/sweeper", dependencies=[Depends(require_admin)])
+async def get_sweeper_stats():
+    return sweeper_stats
+
+@api_router.post("/admin/sweeper/run", dependencies=[Depends(require_admin)])
+async def run_sweeper(orphans: bool = False, dry_run: bool = False):
+    return await sweep_media(orphans=orphans, dry_run=dry_run)
+
+# Admin: request profiles
+@api_router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def get_profiles():
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Request profiling is disabled")
+    return [profile.summary() for profile in reversed(profiles)]
+
+@api_router.get("/admin/profiles/{profile_id}/folded", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    profile = next((p for p in profiles if p.id == profile_id), None)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profile.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
+
 # Include the router in the main app
 app.include_router(api_router)
 
+if PROFILING_ENABLED:
+    app.add_middleware(RequestProfilerMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -436,6 +1187,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+# Process health checks, outside the /api prefix
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    # Warmup errors are only logged; their text names internal hosts
+    status = {"status": "ready" if startup_state["ready"] else "starting", "timings": startup_state["timings"]}
+    return ORJSONResponse(status, status_code=200 if startup_state["ready"] else 503)
+
+startup_state["timings"]["import_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Creative Clicks backend maintenance commands")
+    parser.add_argument("command", choices=["rebuild-analytics", "sweep-media"])
+    parser.add_argument("--orphans", action="store_true", help="sweep-media: also reclaim unreferenced upload files")
+    parser.add_argument("--dry-run", action="store_true", help="sweep-media: report what would be removed")
+    args = parser.parse_args()
+
+    connect_db()
+    if args.command == "rebuild-analytics":
+        print(asyncio.run(rebuild_analytics()))
+    elif args.command == "sweep-media":
+        print(asyncio.run(sweep_media(orphans=args.orphans, dry_run=args.dry_run)))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Creative Clicks Backend Serialization Benchmark
+Compares the per-item Pydantic listing path against the projected ORJSON path
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import server
+
+SIZES = [1_000, 10_000, 100_000]
+ROUNDS = 3
+
+def media_doc(i: int):
+    return {
+        "_id": uuid.uuid4().hex[:24],
+        "id": str(uuid.uuid4()),
+        "filename": f"{uuid.uuid4()}.jpg",
+        "original_name": f"IMG_{i:05d}.JPG",
+        "file_type": "image",
+        "file_path": f"/uploads/{uuid.uuid4()}.jpg",
+        "title": f"Portfolio shot {i}",
+        "description": "Golden hour portrait on the beach",
+        "category": "portfolio",
+        "uploaded_at": datetime(2025, 1, 1) + timedelta(minutes=i),
+        "is_featured": i % 10 == 0,
+    }
+
+def workshop_doc(i: int):
+    start = datetime(2025, 1, 1) + timedelta(days=i)
+    return {
+        "_id": uuid.uuid4().hex[:24],
+        "id": str(uuid.uuid4()),
+        "title": f"Photography Masterclass {i}",
+        "description": "Composition, lighting and post-processing",
+        "price": 150.0,
+        "duration_days": 3,
+        "max_participants": 20,
+        "start_date": start,
+        "end_date": start + timedelta(days=3),
+        "is_active": True,
+        "created_at": datetime(2024, 12, 1),
+    }
+
+def booking_doc(i: int):
+    return {
+        "_id": uuid.uuid4().hex[:24],
+        "id": str(uuid.uuid4()),
+        "client_name": f"Client {i}",
+        "client_email": f"client{i}@example.com",
+        "phone": "+1-555-0123",
+        "event_date": datetime(2025, 6, 1) + timedelta(hours=i),
+        "event_type": "wedding",
+        "services": ["photography", "videography"],
+        "estimated_hours": 8,
+        "special_requests": None,
+        "booking_date": datetime(2025, 1, 1) + timedelta(minutes=i),
+        "status": "pending",
+    }
+
+async def pydantic_path(model, docs) -> bytes:
+    """What the list endpoints did before: build models, then let response_model re-validate them"""
+    field = create_response_field(name=f"Response_{model.__name__}", type_=List[model])
+    items = [model(**doc) for doc in docs]
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+def projected_path(listing, docs):
+    """What the list endpoints do now: Mongo projection drops _id, ORJSON encodes the documents"""
+    projected = [{k: v for k, v in doc.items() if k in listing.projection and k != "_id"} for doc in docs]
+    start = time.perf_counter()
+    body = listing.response(projected).body
+    return body, time.perf_counter() - start
+
+async def bench(name, model, listing, make_doc):
+    for size in SIZES:
+        docs = [make_doc(i) for i in range(size)]
+        before = after = float("inf")
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            await pydantic_path(model, docs)
+            before = min(before, time.perf_counter() - start)
+            _, elapsed = projected_path(listing, docs)
+            after = min(after, elapsed)
+        print(f"{name:<14}{size:>8}{before * 1000:>14.1f}{after * 1000:>14.1f}{before / after:>10.1f}x")
+
+async def main():
+    print("=" * 60)
+    print("CREATIVE CLICKS LISTING SERIALIZATION BENCHMARK")
+    print("=" * 60)
+    print(f"{'listing':<14}{'items':>8}{'pydantic ms':>14}{'orjson ms':>14}{'speedup':>11}")
+    await bench("media", server.MediaItem, server.media_listing, media_doc)
+    await bench("workshops", server.Workshop, server.workshop_listing, workshop_doc)
+    await bench("bookings", server.EventBooking, server.booking_listing, booking_doc)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -32,6 +32,7 @@ class CreativeClicksBackendTester:
     def __init__(self):
         self.base_url = BASE_URL
         self.session = requests.Session()
+        self.admin_headers = {"X-Admin-Token": os.environ.get("ADMIN_TOKEN", "")}
         self.test_results = []
         self.workshop_id = None
         self.registration_id = None
@@ -71,6 +72,22 @@ class CreativeClicksBackendTester:
             self.log_test("Health Check", False, f"Connection error: {str(e)}")
         return False
     
+    def test_readiness(self):
+        """Test GET /healthz and /readyz process checks"""
+        root_url = self.base_url.rsplit("/api", 1)[0]
+        try:
+            health = self.session.get(f"{root_url}/healthz")
+            ready = self.session.get(f"{root_url}/readyz")
+            if health.status_code == 200 and ready.status_code == 200:
+                timings = ready.json().get("timings", {})
+                self.log_test("Readiness Check", True, "Process is up and dependencies are ready", timings)
+                return True
+            else:
+                self.log_test("Readiness Check", False, f"healthz HTTP {health.status_code}, readyz HTTP {ready.status_code}", {"response": ready.text})
+        except Exception as e:
+            self.log_test("Readiness Check", False, f"Connection error: {str(e)}")
+        return False
+    
     def test_create_sample_workshop(self):
         """Create a sample workshop for testing"""
         try:
@@ -218,6 +235,41 @@ class CreativeClicksBackendTester:
             self.log_test("Get Bookings", False, f"Error: {str(e)}")
         return False
     
+    def test_export_bookings(self):
+        """Test GET /api/export/bookings streaming export"""
+        try:
+            response = self.session.get(f"{self.base_url}/export/bookings", params={"format": "csv"}, headers=self.admin_headers)
+            if response.status_code == 200:
+                lines = response.text.splitlines()
+                if lines and lines[0].startswith("id,client_name"):
+                    self.log_test("Export Bookings", True, f"Exported {len(lines) - 1} bookings as CSV", {"rows": len(lines) - 1})
+                    return True
+                else:
+                    self.log_test("Export Bookings", False, "Missing CSV header", {"response": response.text[:200]})
+            else:
+                self.log_test("Export Bookings", False, f"HTTP {response.status_code}", {"response": response.text})
+        except Exception as e:
+            self.log_test("Export Bookings", False, f"Error: {str(e)}")
+        return False
+    
+    def test_get_analytics(self):
+        """Test GET /api/analytics endpoint"""
+        try:
+            response = self.session.get(f"{self.base_url}/analytics", headers=self.admin_headers)
+            if response.status_code == 200:
+                data = response.json()
+                if all(key in data for key in ("bookings_by_month", "workshops", "revenue_by_month")):
+                    booking_count = sum(r.get("count", 0) for r in data["bookings_by_month"])
+                    self.log_test("Get Analytics", True, f"Analytics rollups cover {booking_count} bookings", {"bookings": booking_count})
+                    return True
+                else:
+                    self.log_test("Get Analytics", False, "Missing rollup sections in response", {"response": data})
+            else:
+                self.log_test("Get Analytics", False, f"HTTP {response.status_code}", {"response": response.text})
+        except Exception as e:
+            self.log_test("Get Analytics", False, f"Error: {str(e)}")
+        return False
+    
     def test_contact_form_submission(self):
         """Test POST /api/contact endpoint"""
         try:
@@ -317,6 +369,71 @@ class CreativeClicksBackendTester:
             self.log_test("Get Media by Category", False, f"Error: {str(e)}")
         return False
     
+    def test_search_media(self):
+        """Test GET /api/media/search endpoint"""
+        if not self.media_id:
+            self.log_test("Search Media", False, "No media ID available for testing")
+            return False
+            
+        try:
+            response = self.session.get(f"{self.base_url}/media/search", params={"q": "portfolio samp"})
+            if response.status_code == 200:
+                data = response.json()
+                if not all(key in data for key in ("total", "items", "facets")):
+                    self.log_test("Search Media", False, "Missing total, items or facets in response", {"response": data})
+                elif any(item.get("id") == self.media_id for item in data["items"]):
+                    self.log_test("Search Media", True, f"Prefix search found the uploaded sample among {data['total']} items", {"facets": data["facets"]})
+                    return True
+                else:
+                    self.log_test("Search Media", False, "Prefix search did not return the uploaded sample", {"media_id": self.media_id, "response": data})
+            else:
+                self.log_test("Search Media", False, f"HTTP {response.status_code}", {"response": response.text})
+        except Exception as e:
+            self.log_test("Search Media", False, f"Error: {str(e)}")
+        return False
+    
+    def test_delete_media(self):
+        """Test DELETE /api/media/{id} endpoint"""
+        if not self.media_id:
+            self.log_test("Delete Media", False, "No media ID available for testing")
+            return False
+            
+        try:
+            response = self.session.delete(f"{self.base_url}/media/{self.media_id}")
+            if response.status_code == 200:
+                listing = self.session.get(f"{self.base_url}/media").json()
+                if not any(item.get("id") == self.media_id for item in listing):
+                    self.log_test("Delete Media", True, f"Media {self.media_id} deleted and hidden from listing")
+                    return True
+                else:
+                    self.log_test("Delete Media", False, "Deleted media still listed", {"media_id": self.media_id})
+            else:
+                self.log_test("Delete Media", False, f"HTTP {response.status_code}", {"response": response.text})
+        except Exception as e:
+            self.log_test("Delete Media", False, f"Error: {str(e)}")
+        return False
+    
+    def test_get_profiles(self):
+        """Test GET /api/admin/profiles endpoint"""
+        try:
+            response = self.session.get(f"{self.base_url}/admin/profiles", headers=self.admin_headers)
+            if response.status_code == 200:
+                data = response.json()
+                if isinstance(data, list):
+                    self.log_test("Get Request Profiles", True, f"Retrieved {len(data)} request profiles", {"count": len(data)})
+                    return True
+                else:
+                    self.log_test("Get Request Profiles", False, "Response is not a list", {"response": data})
+            elif response.status_code in (401, 403):
+                self.log_test("Get Request Profiles", False, f"Admin token rejected (HTTP {response.status_code}); set ADMIN_TOKEN", {"response": response.text})
+            elif response.status_code == 404:
+                self.log_test("Get Request Profiles", False, "Request profiling is disabled; set PROFILE_SAMPLE_RATE or PROFILE_SLOW_MS", {"response": response.text})
+            else:
+                self.log_test("Get Request Profiles", False, f"HTTP {response.status_code}", {"response": response.text})
+        except Exception as e:
+            self.log_test("Get Request Profiles", False, f"Error: {str(e)}")
+        return False
+    
     def run_all_tests(self):
         """Run all backend tests"""
         print("=" * 60)
@@ -325,6 +442,7 @@ class CreativeClicksBackendTester:
         
         # Core API Tests
         self.test_health_check()
+        self.test_readiness()
         
         # Workshop Management Tests
         self.test_create_sample_workshop()
@@ -335,6 +453,10 @@ class CreativeClicksBackendTester:
         # Event Booking Tests
         self.test_event_booking_creation()
         self.test_get_bookings()
+        self.test_export_bookings()
+        
+        # Analytics Tests
+        self.test_get_analytics()
         
         # Contact Form Tests
         self.test_contact_form_submission()
@@ -343,6 +465,11 @@ class CreativeClicksBackendTester:
         self.test_media_upload()
         self.test_get_media()
         self.test_get_media_by_category()
+        self.test_search_media()
+        self.test_delete_media()
+        
+        # Admin Tests
+        self.test_get_profiles()
         
         # Summary
         print("\n" + "=" * 60)